@@ -9,11 +9,23 @@ import os
 import sys
 import json
 import time
+import shlex
+import signal
 import logging
+import threading
 import subprocess
 from pathlib import Path
 from datetime import datetime, timedelta
-import schedule
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 # 配置日志
 logging.basicConfig(
@@ -25,9 +37,63 @@ logging.basicConfig(
     ]
 )
 
+def _pid_alive(pid):
+    """检查进程是否仍在运行"""
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+        
+    if os.name == 'nt':
+        # Windows下os.kill(pid, 0)会直接终止目标进程，改用tasklist查询
+        result = subprocess.run(
+            ['tasklist', '/FI', f'PID eq {pid}', '/NH'],
+            capture_output=True,
+            text=True
+        )
+        return str(pid) in result.stdout.split()
+        
+    try:
+        os.kill(pid, 0)
+        return True
+    except PermissionError:
+        return True  # 进程存在但属于其他用户
+    except OSError:
+        return False
+
+# Git命令放入独立进程组，以便停止时连同shell或git派生的子进程一并终止
+if os.name == 'nt':
+    _NEW_PROCESS_GROUP = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_PROCESS_GROUP = {'start_new_session': True}
+
+def _kill_process_tree(proc, force=False):
+    """
+    终止子进程及其派生的所有进程
+    
+    参数：
+        proc: 以独立进程组启动的subprocess.Popen对象
+        force: 是否强制终止（POSIX下使用SIGKILL）
+    """
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(proc.pid)], capture_output=True)
+        return
+        
+    try:
+        os.killpg(proc.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except ProcessLookupError:
+        pass  # 进程组已全部退出
+
 class AutoSyncManager:
     """自动同步管理器"""
     
+    _DEFAULT_CONFIG = {
+        "last_sync": None,
+        "sync_count": 0,
+        "auto_sync_enabled": True,
+        "sync_interval_hours": 72,
+        "retry_count": 3,
+        "retry_delay_seconds": 300
+    }
+    
     def __init__(self, repo_path, sync_interval_hours=72):
         """
         初始化同步管理器
@@ -40,31 +106,35 @@ class AutoSyncManager:
         self.sync_interval = sync_interval_hours
         self.config_file = self.repo_path / 'sync_config.json'
         self.pid_file = self.repo_path / 'auto_sync.pid'
+        self._stop_event = threading.Event()
+        self._pid_cache = None  # (检查时间, PID, 是否运行)
         
     def load_config(self):
         """加载同步配置"""
         if not self.config_file.exists():
-            default_config = {
-                "last_sync": None,
-                "sync_count": 0,
-                "auto_sync_enabled": True,
-                "sync_interval_hours": self.sync_interval,
-                "retry_count": 3,
-                "retry_delay_seconds": 300
-            }
-            self.save_config(default_config)
-            return default_config
+            return self._reset_config()
             
         try:
+            if orjson is not None:
+                return orjson.loads(self.config_file.read_bytes())
             with open(self.config_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
             logging.error(f"加载配置失败: {e}")
-            return self.load_config()  # 返回默认配置
+            return self._reset_config()  # 配置文件损坏时恢复默认配置
+            
+    def _reset_config(self):
+        """写入并返回默认同步配置"""
+        default_config = dict(self._DEFAULT_CONFIG, sync_interval_hours=self.sync_interval)
+        self.save_config(default_config)
+        return default_config
             
     def save_config(self, config):
         """保存同步配置"""
         try:
+            if orjson is not None:
+                self.config_file.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+                return
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
         except Exception as e:
@@ -88,77 +158,170 @@ class AutoSyncManager:
             
     def check_git_status(self):
         """检查Git状态"""
+        command = ['git', '--no-optional-locks', 'status', '--porcelain', '-z']
         try:
-            # 检查是否有未提交的更改
-            result = subprocess.run(
-                ['git', 'status', '--porcelain'],
+            # 检查是否有未提交的更改，只需读取输出的第一个字节即可判断
+            # stderr不接管道：大量警告写满管道缓冲区时，git与本进程会互相等待
+            proc = subprocess.Popen(
+                command,
                 cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=True
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
             )
-            
-            if result.stdout.strip():
-                logging.info("发现未提交的更改")
-                return True
-            else:
-                logging.info("工作区干净，无未提交更改")
-                return False
-                
-        except subprocess.CalledProcessError as e:
+        except OSError as e:
             logging.error(f"检查Git状态失败: {e}")
             return False
             
-    def commit_changes(self, message=None):
-        """提交更改"""
-        if not message:
-            message = f"Auto sync: Update rules - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        first = proc.stdout.read(1)
+        if first:
+            proc.terminate()
+        proc.stdout.close()
+        proc.wait()
+        
+        if first:
+            logging.info("发现未提交的更改")
+            return True
             
+        if proc.returncode != 0:
+            # 仅在失败时重新执行一次以获取错误信息
+            result = subprocess.run(command, cwd=self.repo_path, capture_output=True)
+            logging.error(f"检查Git状态失败: {result.stderr.decode(errors='replace').strip()}")
+            return False
+            
+        logging.info("工作区干净，无未提交更改")
+        return False
+            
+    def _terminate_git(self, proc):
+        """
+        终止Git进程组，超时未退出时强制终止
+        
+        参数：
+            proc: _run_git_process启动的subprocess.Popen对象
+            
+        返回：
+            tuple: (stdout, stderr)
+        """
+        _kill_process_tree(proc)
         try:
-            # 添加所有更改
-            subprocess.run(['git', 'add', '.'], cwd=self.repo_path, check=True)
+            # 须在stop_scheduler强制终止（3秒）之前返回
+            return proc.communicate(timeout=1.5)
+        except subprocess.TimeoutExpired:
+            _kill_process_tree(proc, force=True)
+            return proc.communicate()
             
-            # 提交更改
-            subprocess.run(['git', 'commit', '-m', message], cwd=self.repo_path, check=True)
+    def _run_git_process(self, args, shell=False):
+        """
+        启动Git进程并等待结束，收到停止信号时终止
+        
+        参数：
+            args: 命令参数列表，shell为True时为命令字符串
+            shell: 是否通过shell执行
             
-            logging.info("更改已提交")
-            return True
+        返回：
+            subprocess.CompletedProcess: 执行结果
+        """
+        proc = subprocess.Popen(
+            args,
+            shell=shell,
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            **_NEW_PROCESS_GROUP
+        )
+        
+        # 分段等待，收到停止信号时终止整个进程组（仅终止shell时git仍会占用管道继续运行）
+        try:
+            while True:
+                try:
+                    stdout, stderr = proc.communicate(timeout=0.5)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self._stop_event.is_set():
+                        logging.info("收到停止信号，终止Git命令")
+                        stdout, stderr = self._terminate_git(proc)
+                        break
+        except BaseException:
+            # 终端的Ctrl+C不会传到独立进程组中的git，须主动终止，避免遗留进程占用.git/index.lock
+            self._terminate_git(proc)
+            raise
+                    
+        return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+        
+    def _run_git_batch(self, commands):
+        """
+        依次执行多条Git命令，遇到失败即停止
+        
+        POSIX下用 && 串联，通过一次shell调用执行；Windows下cmd.exe的引号和%VAR%展开
+        无法用list2cmdline安全转义（如提交信息中的 " & |），因此不经shell逐条执行
+        
+        参数：
+            commands: Git命令列表，每条命令为参数列表
+            
+        返回：
+            subprocess.CompletedProcess: 执行结果
+        """
+        if os.name == 'nt':
+            stdout, stderr = [], []
+            for command in commands:
+                result = self._run_git_process(command)
+                stdout.append(result.stdout)
+                stderr.append(result.stderr)
+                if result.returncode != 0:
+                    break
+            result = subprocess.CompletedProcess(commands, result.returncode, ''.join(stdout), ''.join(stderr))
+        else:
+            cmd = ' && '.join(shlex.join(command) for command in commands)
+            result = self._run_git_process(cmd, shell=True)
+            
+        for line in result.stdout.splitlines():
+            logging.info(line)
+        return result
+            
+    def commit_changes(self, message=None):
+        """提交更改"""
+        if not message:
+            message = f"Auto sync: Update rules - {datetime.now().replace(microsecond=0).isoformat(sep=' ')}"
             
-        except subprocess.CalledProcessError as e:
-            logging.error(f"提交更改失败: {e}")
+        # 添加所有更改并提交
+        result = self._run_git_batch([
+            ['git', 'add', '.'],
+            ['git', 'commit', '-m', message]
+        ])
+        
+        if result.returncode != 0:
+            logging.error(f"提交更改失败: {result.stderr.strip()}")
             return False
             
+        logging.info("更改已提交")
+        return True
+            
     def push_to_remote(self, retry_count=3):
         """推送到远程仓库"""
         for attempt in range(retry_count):
-            try:
-                logging.info(f"推送到远程仓库 (尝试 {attempt + 1}/{retry_count})")
-                
-                # 先拉取最新更改
-                subprocess.run(['git', 'pull', 'origin', 'master'], cwd=self.repo_path, check=True)
-                
-                # 推送到远程
-                result = subprocess.run(
-                    ['git', 'push', 'origin', 'master'],
-                    cwd=self.repo_path,
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
+            logging.info(f"推送到远程仓库 (尝试 {attempt + 1}/{retry_count})")
+            
+            # 先拉取最新更改，再推送到远程
+            result = self._run_git_batch([
+                ['git', 'pull', 'origin', 'master'],
+                ['git', 'push', 'origin', 'master']
+            ])
+            
+            if result.returncode == 0:
                 logging.info("成功推送到远程仓库")
                 return True
                 
-            except subprocess.CalledProcessError as e:
-                logging.error(f"推送失败 (尝试 {attempt + 1}): {e}")
-                
-                if attempt < retry_count - 1:
-                    wait_time = (attempt + 1) * 300  # 递增等待时间
-                    logging.info(f"等待 {wait_time} 秒后重试...")
-                    time.sleep(wait_time)
-                else:
-                    logging.error("所有重试尝试均失败")
+            logging.error(f"推送失败 (尝试 {attempt + 1}): {result.stderr.strip()}")
+            
+            if attempt < retry_count - 1:
+                wait_time = (attempt + 1) * 300  # 递增等待时间
+                logging.info(f"等待 {wait_time} 秒后重试...")
+                if self._stop_event.wait(wait_time):
+                    logging.info("收到停止信号，放弃重试")
                     return False
+            else:
+                logging.error("所有重试尝试均失败")
+                return False
                     
         return False
         
@@ -205,6 +368,9 @@ class AutoSyncManager:
         
     def run_scheduler(self):
         """运行定时调度器"""
+        # 仅调度器需要schedule，避免sync/stop/status子命令承担导入开销
+        import schedule
+        
         # 创建PID文件
         try:
             with open(self.pid_file, 'w') as f:
@@ -213,6 +379,9 @@ class AutoSyncManager:
             logging.error(f"创建PID文件失败: {e}")
             return
             
+        # 收到SIGTERM时通知各等待点尽快退出，确保finally中的清理逻辑得以执行
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stop_event.set())
+        
         logging.info(f"启动自动同步调度器，每{self.sync_interval}小时同步一次")
         
         # 立即执行一次同步
@@ -223,8 +392,14 @@ class AutoSyncManager:
         
         try:
             while True:
+                # 直接休眠到下一次任务到期，避免按小时空转唤醒
+                delay = schedule.idle_seconds()
+                if delay is None:
+                    delay = self.sync_interval * 3600
+                if self._stop_event.wait(max(1, delay)):
+                    logging.info("收到停止信号，停止调度器")
+                    break
                 schedule.run_pending()
-                time.sleep(3600)  # 每小时检查一次
                 
         except KeyboardInterrupt:
             logging.info("用户中断，停止调度器")
@@ -237,6 +412,30 @@ class AutoSyncManager:
             except:
                 pass
                 
+    def get_scheduler_status(self, max_age=60):
+        """
+        获取调度器进程状态，结果在max_age秒内复用
+        
+        参数：
+            max_age: 缓存有效期（秒）
+            
+        返回：
+            tuple: (PID, 是否运行)，PID文件不存在或无效时PID为None
+        """
+        now = time.monotonic()
+        if self._pid_cache and now - self._pid_cache[0] < max_age:
+            return self._pid_cache[1:]
+            
+        try:
+            with open(self.pid_file, 'r') as f:
+                pid = int(f.read().strip())
+        except (OSError, ValueError):
+            pid = None
+            
+        alive = pid is not None and _pid_alive(pid)
+        self._pid_cache = (now, pid, alive)
+        return pid, alive
+        
     def stop_scheduler(self):
         """停止调度器"""
         if not self.pid_file.exists():
@@ -247,12 +446,19 @@ class AutoSyncManager:
             with open(self.pid_file, 'r') as f:
                 pid = int(f.read().strip())
                 
-            # 终止进程
-            os.kill(pid, 9)
+            # 先请求正常退出，超时后再强制终止
+            os.kill(pid, signal.SIGTERM)
+            for _ in range(30):
+                if not _pid_alive(pid):
+                    break
+                time.sleep(0.1)
+            else:
+                os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
             logging.info(f"已停止调度器进程 {pid}")
             
-            # 清理PID文件
-            self.pid_file.unlink()
+            # 清理PID文件（调度器正常退出时会自行删除）
+            self.pid_file.unlink(missing_ok=True)
+            self._pid_cache = None
             
         except Exception as e:
             logging.error(f"停止调度器失败: {e}")
@@ -275,14 +481,10 @@ class AutoSyncManager:
             
         # 检查调度器状态
         if self.pid_file.exists():
-            try:
-                with open(self.pid_file, 'r') as f:
-                    pid = int(f.read().strip())
-                    
-                # 检查进程是否存在
-                os.kill(pid, 0)
+            pid, alive = self.get_scheduler_status()
+            if alive:
                 print(f"调度器状态: 运行中 (PID: {pid})")
-            except:
+            else:
                 print("调度器状态: PID文件存在但进程未运行")
         else:
             print("调度器状态: 未运行")
@@ -12,8 +12,10 @@
 """
 
 import os
+import sys
 import json
 import logging
+from functools import cached_property
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from db_lists_parser import DBListsParser
@@ -25,6 +27,12 @@ class ProjectConfigChecker:
     用于验证项目配置是否满足db_lists.txt中的要求
     """
     
+    # 可能存在的MCP配置文件（相对于项目根目录）
+    MCP_CONFIG_CANDIDATES = (
+        "mcp_filesystem_db_config.json",
+        "db_config/mcp_config.json"
+    )
+    
     def __init__(self, project_root: str = "."):
         """
         初始化检查器
@@ -36,6 +44,9 @@ class ProjectConfigChecker:
         self.parser = DBListsParser()
         self.logger = self._setup_logger()
         self.issues = []
+        self._configs = None
+        self._resolved = None
+        self._results_cache = None  # (输入文件状态, 检查结果)
     
     def _setup_logger(self) -> logging.Logger:
         """
@@ -60,6 +71,124 @@ class ProjectConfigChecker:
         
         return logger
     
+    def _get_configs(self) -> List[Dict[str, str]]:
+        """
+        获取解析后的db_lists.txt配置，首次调用时解析并缓存
+        
+        参数:
+            无
+            
+        返回:
+            List[Dict[str, str]]: 配置列表
+        """
+        if self._configs is None:
+            self._configs = self.parser.parse_file()
+        return self._configs
+    
+    def _get_resolved(self) -> List[Dict[str, str]]:
+        """
+        获取解析环境变量后的配置，首次调用时解析并缓存
+        
+        参数:
+            无
+            
+        返回:
+            List[Dict[str, str]]: 包含实际路径的配置列表
+        """
+        if self._resolved is None:
+            self._get_configs()
+            self._resolved = self.parser.resolve_paths()
+        return self._resolved
+    
+    @staticmethod
+    def _exists_batch(paths) -> Dict[Path, bool]:
+        """
+        批量检查路径是否存在，同一父目录只读取一次目录项
+        
+        参数:
+            paths (Iterable[Path]): 待检查的路径
+            
+        返回:
+            Dict[Path, bool]: 路径到是否存在的映射
+        """
+        by_parent = {}
+        for path in paths:
+            path = Path(path)
+            by_parent.setdefault(path.parent, []).append(path)
+        
+        result = {}
+        for parent, children in by_parent.items():
+            try:
+                with os.scandir(parent) as it:
+                    entries = {entry.name: entry for entry in it}
+            except OSError:
+                entries = None
+            for path in children:
+                if entries is None:
+                    result[path] = False
+                    continue
+                entry = entries.get(path.name)
+                if entry is None or entry.is_symlink():
+                    # 名称未精确匹配时交由exists()判断，兼容Windows/macOS大小写不敏感的文件系统；
+                    # 符号链接需确认目标存在
+                    result[path] = path.exists()
+                else:
+                    result[path] = True
+        return result
+    
+    @cached_property
+    def _existing_mcp_configs(self) -> List[Path]:
+        """
+        获取实际存在的MCP配置文件路径，每个候选文件只检查一次
+        
+        参数:
+            无
+            
+        返回:
+            List[Path]: 存在的MCP配置文件路径列表
+        """
+        exists = self._exists_batch(self.project_root / c for c in self.MCP_CONFIG_CANDIDATES)
+        return [path for path, found in exists.items() if found]
+    
+    def reset_cache(self):
+        """
+        清除已缓存的解析结果，下次检查时重新读取db_lists.txt
+        
+        参数:
+            无
+            
+        返回:
+            无
+        """
+        self._configs = None
+        self._resolved = None
+        self._results_cache = None
+        self.__dict__.pop('_existing_mcp_configs', None)
+    
+    def _requirements_key(self) -> Tuple:
+        """
+        生成检查输入的状态标识：相关文件的修改时间及所用环境变量的值
+        
+        参数:
+            无
+            
+        返回:
+            Tuple: 状态标识，任一输入变化时随之变化
+        """
+        paths = [self.parser.db_lists_path, self.project_root]
+        paths.extend(self.project_root / c for c in self.MCP_CONFIG_CANDIDATES)
+        paths.extend(c['actual_path'] for c in self._resolved or [] if c.get('actual_path'))
+        
+        mtimes = []
+        for path in paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        
+        env_values = tuple(os.environ.get(c['system_path_var']) for c in self._configs or [])
+        return tuple(mtimes), env_values
+    
     def check_all_requirements(self) -> Dict[str, any]:
         """
         检查所有项目配置要求
@@ -70,7 +199,12 @@ class ProjectConfigChecker:
         返回:
             Dict[str, any]: 检查结果字典
         """
+        # 输入文件和环境变量均未变化时直接返回上次结果
+        if self._results_cache is not None and self._results_cache[0] == self._requirements_key():
+            return self._results_cache[1]
+        
         self.issues = []
+        self.reset_cache()
         results = {
             "db_lists_valid": False,
             "env_vars_set": False,
@@ -88,17 +222,19 @@ class ProjectConfigChecker:
         if db_lists_result["issues"]:
             self.issues.extend(db_lists_result["issues"])
         
-        # 2. 检查环境变量设置
-        env_vars_result = self.check_environment_variables()
-        results["env_vars_set"] = env_vars_result["all_set"]
-        if env_vars_result["issues"]:
-            self.issues.extend(env_vars_result["issues"])
-        
-        # 3. 检查路径存在性
-        paths_result = self.check_paths_existence()
-        results["paths_exist"] = paths_result["all_exist"]
-        if paths_result["issues"]:
-            self.issues.extend(paths_result["issues"])
+        # 2、3 依赖db_lists.txt中的配置，文件无效时直接跳过（结果保持为False）
+        if results["db_lists_valid"]:
+            # 2. 检查环境变量设置
+            env_vars_result = self.check_environment_variables()
+            results["env_vars_set"] = env_vars_result["all_set"]
+            if env_vars_result["issues"]:
+                self.issues.extend(env_vars_result["issues"])
+            
+            # 3. 检查路径存在性
+            paths_result = self.check_paths_existence()
+            results["paths_exist"] = paths_result["all_exist"]
+            if paths_result["issues"]:
+                self.issues.extend(paths_result["issues"])
         
         # 4. 检查MCP配置
         mcp_result = self.check_mcp_configurations()
@@ -127,6 +263,7 @@ class ProjectConfigChecker:
         results["overall_status"] = "PASSED" if all_checks_passed else "FAILED"
         results["issues"] = self.issues
         
+        self._results_cache = (self._requirements_key(), results)
         return results
     
     def check_db_lists_file(self) -> Dict[str, any]:
@@ -151,7 +288,7 @@ class ProjectConfigChecker:
             return result
         
         # 解析文件
-        configs = self.parser.parse_file()
+        configs = self._get_configs()
         if not configs:
             result["issues"].append({
                 "type": "EMPTY_FILE",
@@ -177,14 +314,15 @@ class ProjectConfigChecker:
         """
         result = {"all_set": True, "missing_vars": [], "issues": []}
         
-        configs = self.parser.parse_file()
+        configs = self._get_configs()
         if not configs:
             result["all_set"] = False
             return result
         
+        environ = dict(os.environ)
         for config in configs:
             var_name = config['system_path_var']
-            var_value = os.environ.get(var_name)
+            var_value = environ.get(var_name)
             
             if not var_value:
                 result["missing_vars"].append(var_name)
@@ -212,7 +350,7 @@ class ProjectConfigChecker:
         """
         result = {"all_exist": True, "missing_paths": [], "issues": []}
         
-        resolved_configs = self.parser.resolve_paths()
+        resolved_configs = self._get_resolved()
         if not resolved_configs:
             result["all_exist"] = False
             return result
@@ -222,8 +360,8 @@ class ProjectConfigChecker:
             if not actual_path:
                 continue
             
-            path_obj = Path(actual_path)
-            if not path_obj.exists():
+            # resolve_paths 已检查过路径存在性，直接复用其结果
+            if not config['path_exists']:
                 result["missing_paths"].append(actual_path)
                 result["all_exist"] = False
                 result["issues"].append({
@@ -250,16 +388,7 @@ class ProjectConfigChecker:
         result = {"valid": True, "issues": []}
         
         # 检查是否存在MCP配置文件
-        mcp_config_files = [
-            "mcp_filesystem_db_config.json",
-            "db_config/mcp_config.json"
-        ]
-        
-        existing_configs = []
-        for config_file in mcp_config_files:
-            config_path = self.project_root / config_file
-            if config_path.exists():
-                existing_configs.append(config_path)
+        existing_configs = self._existing_mcp_configs
         
         if not existing_configs:
             result["valid"] = False
@@ -274,8 +403,7 @@ class ProjectConfigChecker:
         # 验证配置文件内容
         for config_path in existing_configs:
             try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = json.load(f)
+                config_data = json.loads(config_path.read_bytes())
                 
                 # 检查基本结构
                 if 'mcpServers' not in config_data:
@@ -320,11 +448,13 @@ class ProjectConfigChecker:
             "check_project_config.py"
         ]
         
-        missing_items = []
-        for item in required_items:
-            item_path = self.project_root / item
-            if not item_path.exists():
-                missing_items.append(item)
+        # 检查配置文件目录
+        config_dirs = ["db_config"]
+        
+        # 所有条目位于项目根目录下，一次读取目录项即可
+        exists = self._exists_batch(self.project_root / item for item in required_items + config_dirs)
+        
+        missing_items = [item for item in required_items if not exists[self.project_root / item]]
         
         if missing_items:
             result["valid"] = False
@@ -335,11 +465,8 @@ class ProjectConfigChecker:
                 "fix": "确保所有必要文件都存在"
             })
         
-        # 检查配置文件目录
-        config_dirs = ["db_config"]
         for config_dir in config_dirs:
-            dir_path = self.project_root / config_dir
-            if dir_path.exists():
+            if exists[self.project_root / config_dir]:
                 self.logger.info(f"配置目录存在: {config_dir}")
             else:
                 self.logger.warning(f"配置目录不存在: {config_dir}")
@@ -362,38 +489,28 @@ class ProjectConfigChecker:
         if not self.parser.db_lists_path.exists():
             recommendations.append("创建 db_lists.txt 文件并添加MCP服务器配置")
         
-        configs = self.parser.parse_file()
+        configs = self._get_configs()
         if configs:
+            environ = dict(os.environ)
             missing_vars = []
             for config in configs:
                 var_name = config['system_path_var']
-                if not os.environ.get(var_name):
+                if not environ.get(var_name):
                     missing_vars.append(var_name)
             
             if missing_vars:
                 recommendations.append(f"设置缺失的环境变量: {', '.join(missing_vars)}")
         
         # 检查路径
-        resolved_configs = self.parser.resolve_paths()
+        resolved_configs = self._get_resolved()
         missing_paths = [c.get('actual_path') for c in resolved_configs 
-                        if c.get('actual_path') and not Path(c['actual_path']).exists()]
+                        if c.get('actual_path') and not c['path_exists']]
         
         if missing_paths:
             recommendations.append(f"创建缺失的路径或修正环境变量: {', '.join(missing_paths)}")
         
         # MCP配置建议
-        mcp_config_files = [
-            "mcp_filesystem_db_config.json",
-            "db_config/mcp_config.json"
-        ]
-        
-        existing_configs = []
-        for config_file in mcp_config_files:
-            config_path = self.project_root / config_file
-            if config_path.exists():
-                existing_configs.append(config_path)
-        
-        if not existing_configs:
+        if not self._existing_mcp_configs:
             recommendations.append("生成MCP配置文件以启用数据库管理功能")
         
         # 安全建议
@@ -414,15 +531,16 @@ class ProjectConfigChecker:
             无
         """
         results = self.check_all_requirements()
+        lines = []
         
-        print("\n" + "=" * 70)
-        print("项目配置检查报告")
-        print("=" * 70)
+        lines.append("\n" + "=" * 70)
+        lines.append("项目配置检查报告")
+        lines.append("=" * 70)
         
         # 总体状态
         status_color = "✓" if results["overall_status"] == "PASSED" else "✗"
-        print(f"总体状态: {status_color} {results['overall_status']}")
-        print()
+        lines.append(f"总体状态: {status_color} {results['overall_status']}")
+        lines.append("")
         
         # 详细检查结果
         checks = [
@@ -435,34 +553,37 @@ class ProjectConfigChecker:
         
         for check_key, check_name in checks:
             status = "✓" if results[check_key] else "✗"
-            print(f"{status} {check_name}")
+            lines.append(f"{status} {check_name}")
         
-        print()
+        lines.append("")
         
         # 问题列表
         if results["issues"]:
-            print("发现的问题:")
-            print("-" * 40)
+            lines.append("发现的问题:")
+            lines.append("-" * 40)
             for i, issue in enumerate(results["issues"], 1):
                 severity = issue.get("severity", "INFO")
                 message = issue.get("message", "")
                 fix = issue.get("fix", "")
                 
-                print(f"{i}. [{severity}] {message}")
+                lines.append(f"{i}. [{severity}] {message}")
                 if fix:
-                    print(f"   建议: {fix}")
-                print()
+                    lines.append(f"   建议: {fix}")
+                lines.append("")
         
         # 改进建议
         if results["recommendations"]:
-            print("改进建议:")
-            print("-" * 40)
+            lines.append("改进建议:")
+            lines.append("-" * 40)
             for i, recommendation in enumerate(results["recommendations"], 1):
-                print(f"{i}. {recommendation}")
-            print()
+                lines.append(f"{i}. {recommendation}")
+            lines.append("")
         
-        print("=" * 70)
-
+        lines.append("=" * 70)
+        
+        # 一次性输出整份报告
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
 def main():
     """
@@ -13,19 +13,134 @@ db_lists.txt 管理工具自动化测试脚本
 
 import os
 import sys
+import copy
+import queue
+import time
 import tempfile
-import shutil
 import subprocess
 import json
+import argparse
+import logging
+import logging.handlers
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from env_utils import temp_environ
+
+
+class _RecordCollector(logging.Handler):
+    """
+    收集日志记录的处理器，用于把子进程中的测试日志带回主进程
+    """
+    
+    def __init__(self):
+        """
+        初始化收集器
+        
+        参数:
+            无
+        """
+        super().__init__()
+        self.records = []
+    
+    def emit(self, record):
+        """
+        保存日志记录，参照QueueHandler.prepare预先格式化消息，
+        清除args和exc_info等可能无法pickle的字段，保证能经管道回传
+        
+        参数:
+            record (logging.LogRecord): 日志记录
+        """
+        msg = self.format(record)
+        record = copy.copy(record)
+        record.message = msg
+        record.msg = msg
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        self.records.append(record)
+
+
+def _run_test_worker(tester, method_name, conn):
+    """
+    在独立子进程中运行单个测试方法，通过管道回传日志记录和测试结果
+    
+    参数:
+        tester (DBListsManagementTester): 测试器副本
+        method_name (str): 测试方法名
+        conn (multiprocessing.connection.Connection): 管道发送端
+        
+    返回:
+        无
+    """
+    collector = _RecordCollector()
+    tester.logger = logging.getLogger(f"{__name__}.{method_name}")
+    tester.logger.setLevel(logging.INFO)
+    tester.logger.propagate = False
+    tester.logger.handlers = [collector]
+    tester.reset_results()
+    
+    try:
+        getattr(tester, method_name)()
+    finally:
+        conn.send((collector.records, tester.result_columns()))
+        conn.close()
+
+
+def _parallel_rmtree(path, max_workers=8):
+    """
+    删除目录树，文件删除由线程池并发执行
+    
+    参数:
+        path (Path): 要删除的目录
+        max_workers (int): 并发删除的线程数
+        
+    返回:
+        无
+    """
+    files = []
+    dirs = []
+    stack = [os.fspath(path)]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(os.unlink, files))
+    
+    # 子目录总在父目录之后入列，逆序删除即可保证先删子目录
+    for directory in reversed(dirs):
+        os.rmdir(directory)
+
 
 class DBListsManagementTester:
     """
     db_lists.txt 管理工具测试器
     """
     
+    # 相互独立、可并行执行的测试方法
+    TEST_METHODS = (
+        "test_db_lists_parser_basic",
+        "test_set_system_path_var",
+        "test_check_project_config",
+        "test_integration_workflow",
+        "test_error_handling"
+    )
+    
     def __init__(self):
         """
         初始化测试器
@@ -35,7 +150,7 @@ class DBListsManagementTester:
         """
         self.test_dir = Path("test_workspace")
         self.log_file = f"autotest-db-lists-{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        self.test_results = []
+        self.reset_results()
         
         # 创建测试目录
         self.test_dir.mkdir(exist_ok=True)
@@ -50,8 +165,6 @@ class DBListsManagementTester:
         参数:
             无
         """
-        import logging
-        
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         
@@ -70,8 +183,79 @@ class DBListsManagementTester:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # 测试线程只负责入队，由后台监听线程批量写入文件和控制台
+        log_queue = queue.Queue(-1)
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self.log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self.log_listener.start()
+    
+    def __getstate__(self):
+        """
+        序列化测试器时去掉日志对象（含线程和锁，无法传给工作进程）
+        
+        参数:
+            无
+            
+        返回:
+            dict: 可序列化的实例状态
+        """
+        state = self.__dict__.copy()
+        state.pop("logger", None)
+        state.pop("log_listener", None)
+        return state
+    
+    def stop_logging(self):
+        """
+        停止日志监听线程，确保队列中的日志全部写出
+        
+        参数:
+            无
+        """
+        self.log_listener.stop()
+        for handler in self.log_listener.handlers:
+            handler.close()
+    
+    def reset_results(self):
+        """
+        清空测试结果，结果按列存储（名称/是否成功/消息/时间戳各一个列表）
+        
+        参数:
+            无
+            
+        返回:
+            无
+        """
+        self.test_names = []
+        self.test_successes = []
+        self.test_messages = []
+        self.test_ts = []
+    
+    def result_columns(self):
+        """
+        获取测试结果的各列，用于在进程间传递
+        
+        参数:
+            无
+            
+        返回:
+            tuple: (名称列表, 是否成功列表, 消息列表, 时间戳列表)
+        """
+        return self.test_names, self.test_successes, self.test_messages, self.test_ts
+    
+    def merge_results(self, columns):
+        """
+        合并其他测试器回传的测试结果列
+        
+        参数:
+            columns (tuple): result_columns() 返回的各列
+            
+        返回:
+            无
+        """
+        for target, values in zip(self.result_columns(), columns):
+            target.extend(values)
     
     def log_test_start(self, test_name):
         """
@@ -98,12 +282,10 @@ class DBListsManagementTester:
         if message:
             self.logger.info(f"  详情: {message}")
         
-        self.test_results.append({
-            "test_name": test_name,
-            "success": success,
-            "message": message,
-            "timestamp": datetime.now().isoformat()
-        })
+        self.test_names.append(test_name)
+        self.test_successes.append(bool(success))
+        self.test_messages.append(message)
+        self.test_ts.append(time.time())
     
     def test_db_lists_parser_basic(self):
         """
@@ -127,8 +309,7 @@ mcp_server:sqlite|TEST_SQLITE_PATH
 mcp_server:postgres|TEST_POSTGRES_PATH
 """
             
-            with open(test_file, 'w', encoding='utf-8') as f:
-                f.write(test_content)
+            test_file.write_text(test_content, encoding='utf-8')
             
             # 导入并测试解析器
             from db_lists_parser import DBListsParser
@@ -142,27 +323,24 @@ mcp_server:postgres|TEST_POSTGRES_PATH
                 self.log_test_result("解析配置数量", False, f"期望 3 个，实际 {len(configs)} 个")
             
             # 测试环境变量解析
-            os.environ["TEST_FILESYSTEM_PATH"] = "/tmp/test.db"
-            resolved_configs = parser.resolve_paths()
-            
-            filesystem_config = next((c for c in resolved_configs if c['mcp_server'] == 'filesystem'), None)
-            if filesystem_config and filesystem_config.get('actual_path') == '/tmp/test.db':
-                self.log_test_result("环境变量解析", True)
-            else:
-                self.log_test_result("环境变量解析", False)
-            
-            # 测试验证功能
-            valid_configs, invalid_configs = parser.validate_configs()
-            
-            # 应该有一个有效配置（filesystem），两个无效配置（环境变量未设置）
-            if len(valid_configs) >= 1 and len(invalid_configs) >= 2:
-                self.log_test_result("配置验证", True, f"有效: {len(valid_configs)}, 无效: {len(invalid_configs)}")
-            else:
-                self.log_test_result("配置验证", False)
-            
-            # 清理环境变量
-            if "TEST_FILESYSTEM_PATH" in os.environ:
-                del os.environ["TEST_FILESYSTEM_PATH"]
+            with temp_environ(TEST_FILESYSTEM_PATH="/tmp/test.db"):
+                resolved_configs = parser.resolve_paths()
+                cfg_by_server = {c['mcp_server']: c for c in resolved_configs}
+                
+                filesystem_config = cfg_by_server.get('filesystem')
+                if filesystem_config and filesystem_config.get('actual_path') == '/tmp/test.db':
+                    self.log_test_result("环境变量解析", True)
+                else:
+                    self.log_test_result("环境变量解析", False)
+                
+                # 测试验证功能
+                valid_configs, invalid_configs = parser.validate_configs()
+                
+                # 应该有一个有效配置（filesystem），两个无效配置（环境变量未设置）
+                if len(valid_configs) >= 1 and len(invalid_configs) >= 2:
+                    self.log_test_result("配置验证", True, f"有效: {len(valid_configs)}, 无效: {len(invalid_configs)}")
+                else:
+                    self.log_test_result("配置验证", False)
             
         except Exception as e:
             self.log_test_result("db_lists_parser 基本功能", False, str(e))
@@ -194,34 +372,31 @@ mcp_server:postgres|TEST_POSTGRES_PATH
             # 测试环境变量获取
             test_var = "TEST_VAR_FOR_CHECK"
             test_value = "/tmp/test/path"
-            os.environ[test_var] = test_value
-            
-            retrieved_value = manager.get_env_var(test_var)
-            if retrieved_value == test_value:
-                self.log_test_result("环境变量获取", True)
-            else:
-                self.log_test_result("环境变量获取", False)
-            
-            # 测试配置保存和加载
-            test_config = {
-                "test_integration": {
-                    "var_name": test_var,
-                    "db_path": test_value,
-                    "created_at": "2025-01-01T00:00:00"
+            with temp_environ(TEST_VAR_FOR_CHECK=test_value):
+                retrieved_value = manager.get_env_var(test_var)
+                if retrieved_value == test_value:
+                    self.log_test_result("环境变量获取", True)
+                else:
+                    self.log_test_result("环境变量获取", False)
+                
+                # 测试配置保存和加载
+                test_config = {
+                    "test_integration": {
+                        "var_name": test_var,
+                        "db_path": test_value,
+                        "created_at": "2025-01-01T00:00:00"
+                    }
                 }
-            }
-            
-            success = manager.save_config(test_config)
-            loaded_config = manager.load_existing_config()
-            
-            if success and loaded_config.get("test_integration", {}).get("var_name") == test_var:
-                self.log_test_result("配置保存加载", True)
-            else:
-                self.log_test_result("配置保存加载", False)
+                
+                success = manager.save_config(test_config)
+                loaded_config = manager.load_existing_config()
+                
+                if success and loaded_config.get("test_integration", {}).get("var_name") == test_var:
+                    self.log_test_result("配置保存加载", True)
+                else:
+                    self.log_test_result("配置保存加载", False)
             
             # 清理
-            if "TEST_VAR_FOR_CHECK" in os.environ:
-                del os.environ["TEST_VAR_FOR_CHECK"]
             if os.path.exists("db_path_config.json"):
                 os.remove("db_path_config.json")
             
@@ -290,48 +465,43 @@ mcp_server:postgres|TEST_POSTGRES_PATH
             test_db_lists = self.test_dir / "test_integration_db_lists.txt"
             
             test_content = f"mcp_server:filesystem|TEST_INTEGRATION_DB\n"
-            with open(test_db_lists, 'w', encoding='utf-8') as f:
-                f.write(test_content)
-            
-            # 2. 设置环境变量
-            os.environ["TEST_INTEGRATION_DB"] = test_db_path
-            
-            # 3. 使用解析器解析
-            from db_lists_parser import DBListsParser
-            parser = DBListsParser(str(test_db_lists))
-            configs = parser.parse_file()
-            
-            if configs:
-                self.log_test_result("配置解析", True, f"解析到 {len(configs)} 个配置")
+            test_db_lists.write_text(test_content, encoding='utf-8')
+            
+            # 2. 设置环境变量（离开代码块时自动恢复）
+            with temp_environ(TEST_INTEGRATION_DB=test_db_path):
+                # 3. 使用解析器解析
+                from db_lists_parser import DBListsParser
+                parser = DBListsParser(str(test_db_lists))
+                configs = parser.parse_file()
                 
-                # 4. 验证配置
-                resolved_configs = parser.resolve_paths()
-                filesystem_config = next((c for c in resolved_configs if c['mcp_server'] == 'filesystem'), None)
+                if configs:
+                    self.log_test_result("配置解析", True, f"解析到 {len(configs)} 个配置")
                 
-                if filesystem_config and filesystem_config.get('actual_path') == test_db_path:
-                    self.log_test_result("环境变量解析", True)
-                    
-                    # 5. 生成MCP配置
-                    mcp_configs = parser.generate_mcp_configs()
-                    if mcp_configs:
-                        self.log_test_result("MCP配置生成", True, f"生成 {len(mcp_configs)} 个配置")
-                        
-                        # 验证MCP配置结构
-                        mcp_config = mcp_configs[0]['config']
-                        if 'command' in mcp_config and 'args' in mcp_config:
-                            self.log_test_result("MCP配置结构", True)
+                    # 4. 验证配置
+                    resolved_configs = parser.resolve_paths()
+                    cfg_by_server = {c['mcp_server']: c for c in resolved_configs}
+                    filesystem_config = cfg_by_server.get('filesystem')
+                
+                    if filesystem_config and filesystem_config.get('actual_path') == test_db_path:
+                        self.log_test_result("环境变量解析", True)
+                
+                        # 5. 生成MCP配置
+                        mcp_configs = parser.generate_mcp_configs()
+                        if mcp_configs:
+                            self.log_test_result("MCP配置生成", True, f"生成 {len(mcp_configs)} 个配置")
+                
+                            # 验证MCP配置结构
+                            mcp_config = mcp_configs[0]['config']
+                            if 'command' in mcp_config and 'args' in mcp_config:
+                                self.log_test_result("MCP配置结构", True)
+                            else:
+                                self.log_test_result("MCP配置结构", False)
                         else:
-                            self.log_test_result("MCP配置结构", False)
+                            self.log_test_result("MCP配置生成", False)
                     else:
-                        self.log_test_result("MCP配置生成", False)
+                        self.log_test_result("环境变量解析", False)
                 else:
-                    self.log_test_result("环境变量解析", False)
-            else:
-                self.log_test_result("配置解析", False)
-            
-            # 清理
-            if "TEST_INTEGRATION_DB" in os.environ:
-                del os.environ["TEST_INTEGRATION_DB"]
+                    self.log_test_result("配置解析", False)
             
         except Exception as e:
             self.log_test_result("完整工作流程", False, str(e))
@@ -353,9 +523,7 @@ mcp_server:postgres|TEST_POSTGRES_PATH
             
             # 测试无效文件格式
             invalid_file = self.test_dir / "invalid_format.txt"
-            with open(invalid_file, 'w', encoding='utf-8') as f:
-                f.write("invalid line format\n")
-                f.write("another invalid line\n")
+            invalid_file.write_text("invalid line format\nanother invalid line\n", encoding='utf-8')
             
             parser = DBListsParser(str(invalid_file))
             configs = parser.parse_file()
@@ -377,8 +545,7 @@ mcp_server:postgres|TEST_POSTGRES_PATH
             
             # 测试无效环境变量名
             invalid_env_file = self.test_dir / "invalid_env.txt"
-            with open(invalid_env_file, 'w', encoding='utf-8') as f:
-                f.write("mcp_server:filesystem|123invalid\n")  # 以数字开头
+            invalid_env_file.write_text("mcp_server:filesystem|123invalid\n", encoding='utf-8')  # 以数字开头
             
             parser = DBListsParser(str(invalid_env_file))
             configs = parser.parse_file()
@@ -405,8 +572,8 @@ mcp_server:postgres|TEST_POSTGRES_PATH
         self.logger.info("测试报告")
         self.logger.info("=" * 60)
         
-        total_tests = len(self.test_results)
-        passed_tests = sum(1 for r in self.test_results if r['success'])
+        total_tests = len(self.test_names)
+        passed_tests = sum(self.test_successes)
         failed_tests = total_tests - passed_tests
         
         self.logger.info(f"总测试数: {total_tests}")
@@ -416,9 +583,9 @@ mcp_server:postgres|TEST_POSTGRES_PATH
         
         if failed_tests > 0:
             self.logger.info("\n失败的测试:")
-            for result in self.test_results:
-                if not result['success']:
-                    self.logger.info(f"  - {result['test_name']}: {result['message']}")
+            for name, success, message in zip(self.test_names, self.test_successes, self.test_messages):
+                if not success:
+                    self.logger.info(f"  - {name}: {message}")
         
         # 保存测试结果到文件
         report_data = {
@@ -429,12 +596,25 @@ mcp_server:postgres|TEST_POSTGRES_PATH
                 "failed": failed_tests,
                 "success_rate": passed_tests/total_tests*100
             },
-            "details": self.test_results
+            "details": [
+                {
+                    "test_name": name,
+                    "success": success,
+                    "message": message,
+                    "timestamp": datetime.fromtimestamp(ts).isoformat()
+                }
+                for name, success, message, ts in zip(*self.result_columns())
+            ]
         }
         
         report_file = self.test_dir / "test_report.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
+        # 先序列化为完整的字节串，再一次性写入
+        if orjson is not None:
+            payload = orjson.dumps(report_data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(report_data, indent=2, ensure_ascii=False).encode('utf-8')
+        with open(report_file, 'wb', buffering=65536) as f:
+            f.write(payload)
         
         self.logger.info(f"\n详细报告已保存到: {report_file}")
         self.logger.info(f"日志文件: {self.log_file}")
@@ -451,17 +631,17 @@ mcp_server:postgres|TEST_POSTGRES_PATH
         """
         try:
             if self.test_dir.exists():
-                shutil.rmtree(self.test_dir)
+                _parallel_rmtree(self.test_dir)
             self.logger.info("测试环境已清理")
         except Exception as e:
             self.logger.error(f"清理测试环境失败: {e}")
     
-    def run_all_tests(self):
+    def run_all_tests(self, workers=None):
         """
         运行所有测试
         
         参数:
-            无
+            workers (int): 并行工作进程数，默认每个测试一个进程，1表示顺序执行
             
         返回:
             无
@@ -470,11 +650,40 @@ mcp_server:postgres|TEST_POSTGRES_PATH
         self.logger.info(f"测试时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         # 运行所有测试
-        self.test_db_lists_parser_basic()
-        self.test_set_system_path_var()
-        self.test_check_project_config()
-        self.test_integration_workflow()
-        self.test_error_handling()
+        if workers is None:
+            workers = len(self.TEST_METHODS)
+        
+        if workers <= 1:
+            for method_name in self.TEST_METHODS:
+                getattr(self, method_name)()
+        else:
+            # 每个测试使用全新的子进程，模块状态和环境变量互不影响
+            methods = self.TEST_METHODS
+            for start in range(0, len(methods), workers):
+                batch = []
+                for method_name in methods[start:start + workers]:
+                    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+                    process = multiprocessing.Process(
+                        target=_run_test_worker,
+                        args=(self, method_name, child_conn)
+                    )
+                    process.start()
+                    child_conn.close()
+                    batch.append((method_name, process, parent_conn))
+                
+                # 按启动顺序回放日志，输出与顺序执行保持一致
+                for method_name, process, parent_conn in batch:
+                    try:
+                        records, columns = parent_conn.recv()
+                    except EOFError:
+                        records, columns = [], ()
+                        self.log_test_result(method_name, False, "测试进程异常退出")
+                    parent_conn.close()
+                    process.join()
+                    
+                    for record in records:
+                        self.logger.handle(record)
+                    self.merge_results(columns)
         
         # 生成报告
         self.generate_test_report()
@@ -483,6 +692,7 @@ mcp_server:postgres|TEST_POSTGRES_PATH
         self.cleanup()
         
         self.logger.info("\n测试完成")
+        self.stop_logging()
 
 
 def main():
@@ -495,8 +705,13 @@ def main():
     返回:
         无
     """
+    arg_parser = argparse.ArgumentParser(description="db_lists.txt 管理工具自动化测试")
+    arg_parser.add_argument("--workers", type=int, default=None,
+                            help="并行工作进程数，1表示顺序执行")
+    args = arg_parser.parse_args()
+    
     tester = DBListsManagementTester()
-    tester.run_all_tests()
+    tester.run_all_tests(workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -13,9 +13,16 @@
 
 import json
 import os
-import datetime
+import time
+import asyncio
+from functools import cached_property
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class DatabaseFilesystemManager:
     """
@@ -33,10 +40,18 @@ class DatabaseFilesystemManager:
         self.db_path = Path(db_path)
         self.db_dir = self.db_path.parent
         self.backup_dir = self.db_dir / "backup"
+        # 预先缓存路径字符串，避免每次生成配置时重复转换
+        self._db_path_str = str(self.db_path)
+        self._db_dir_str = str(self.db_dir)
+        self._backup_dir_str = str(self.backup_dir)
+        # 备份文件名中只有时间戳会变化，前后缀预先拼好
+        self._backup_prefix = os.path.join(self._backup_dir_str, f"{self.db_path.stem}_backup_")
+        self._backup_suffix = self.db_path.suffix
         
-    def generate_mcp_config(self):
+    @cached_property
+    def mcp_config(self):
         """
-        生成MCP配置文件
+        生成MCP配置文件（内容只取决于db_path，首次访问后缓存）
         
         参数:
             无
@@ -51,16 +66,29 @@ class DatabaseFilesystemManager:
                     "args": [
                         "-y",
                         "@modelcontextprotocol/server-filesystem",
-                        str(self.db_dir)
+                        self._db_dir_str
                     ]
                 }
             }
         }
         return config
     
-    def create_backup_strategy(self):
+    def generate_mcp_config(self):
         """
-        创建备份策略配置
+        生成MCP配置文件，返回缓存的同一对象
+        
+        参数:
+            无
+            
+        返回:
+            dict: MCP配置字典
+        """
+        return self.mcp_config
+    
+    @cached_property
+    def backup_strategy(self):
+        """
+        创建备份策略配置（内容固定，首次访问后缓存）
         
         参数:
             无
@@ -84,9 +112,22 @@ class DatabaseFilesystemManager:
         }
         return strategy
     
-    def generate_file_operations(self):
+    def create_backup_strategy(self):
         """
-        生成文件操作命令列表
+        创建备份策略配置，返回缓存的同一对象
+        
+        参数:
+            无
+            
+        返回:
+            dict: 备份策略配置
+        """
+        return self.backup_strategy
+    
+    @cached_property
+    def file_operations(self):
+        """
+        生成文件操作命令列表（内容只取决于db_path，首次访问后缓存）
         
         参数:
             无
@@ -99,34 +140,46 @@ class DatabaseFilesystemManager:
                 "name": "获取数据库信息",
                 "tool": "get_file_info",
                 "params": {
-                    "path": str(self.db_path)
+                    "path": self._db_path_str
                 }
             },
             {
                 "name": "创建备份目录",
                 "tool": "create_directory",
                 "params": {
-                    "path": str(self.backup_dir)
+                    "path": self._backup_dir_str
                 }
             },
             {
                 "name": "列出数据库目录",
                 "tool": "list_directory",
                 "params": {
-                    "path": str(self.db_dir)
+                    "path": self._db_dir_str
                 }
             },
             {
                 "name": "搜索数据库文件",
                 "tool": "search_files",
                 "params": {
-                    "path": str(self.db_dir),
+                    "path": self._db_dir_str,
                     "pattern": "*.mdb"
                 }
             }
         ]
         return operations
     
+    def generate_file_operations(self):
+        """
+        生成文件操作命令列表，返回缓存的同一对象
+        
+        参数:
+            无
+            
+        返回:
+            list: 文件操作命令列表
+        """
+        return self.file_operations
+    
     def generate_backup_filename(self):
         """
         生成备份文件名
@@ -137,13 +190,12 @@ class DatabaseFilesystemManager:
         返回:
             str: 备份文件路径
         """
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"{self.db_path.stem}_backup_{timestamp}{self.db_path.suffix}"
-        return str(self.backup_dir / backup_filename)
+        return self._backup_prefix + time.strftime("%Y%m%d_%H%M%S") + self._backup_suffix
     
-    def create_maintenance_plan(self):
+    @cached_property
+    def maintenance_plan(self):
         """
-        创建数据库维护计划
+        创建数据库维护计划（内容固定，首次访问后缓存）
         
         参数:
             无
@@ -170,6 +222,52 @@ class DatabaseFilesystemManager:
         }
         return plan
     
+    def create_maintenance_plan(self):
+        """
+        创建数据库维护计划，返回缓存的同一对象
+        
+        参数:
+            无
+            
+        返回:
+            dict: 维护计划
+        """
+        return self.maintenance_plan
+    
+    def _write_json(self, file_path, data):
+        """
+        将数据以JSON格式写入文件，优先使用orjson
+        
+        参数:
+            file_path (Path): 输出文件路径
+            data: 要写入的数据
+            
+        返回:
+            无
+        """
+        if orjson is not None:
+            Path(file_path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            return
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    
+    def _config_exports(self):
+        """
+        生成待导出的配置文件内容
+        
+        参数:
+            无
+            
+        返回:
+            dict: 文件名到配置内容的映射
+        """
+        return {
+            "mcp_config.json": self.mcp_config,
+            "backup_strategy.json": self.backup_strategy,
+            "file_operations.json": self.file_operations,
+            "maintenance_plan.json": self.maintenance_plan
+        }
+    
     def export_config_files(self):
         """
         导出所有配置文件
@@ -184,25 +282,29 @@ class DatabaseFilesystemManager:
         config_dir = Path("db_config")
         config_dir.mkdir(exist_ok=True)
         
-        # 导出MCP配置
-        mcp_config = self.generate_mcp_config()
-        with open(config_dir / "mcp_config.json", "w", encoding="utf-8") as f:
-            json.dump(mcp_config, f, indent=2, ensure_ascii=False)
+        for file_name, data in self._config_exports().items():
+            self._write_json(config_dir / file_name, data)
         
-        # 导出备份策略
-        backup_strategy = self.create_backup_strategy()
-        with open(config_dir / "backup_strategy.json", "w", encoding="utf-8") as f:
-            json.dump(backup_strategy, f, indent=2, ensure_ascii=False)
+        print(f"配置文件已导出到 {config_dir} 目录")
+    
+    async def export_config_files_async(self):
+        """
+        异步导出所有配置文件，各文件在线程池中并发写入，不阻塞事件循环
         
-        # 导出文件操作命令
-        operations = self.generate_file_operations()
-        with open(config_dir / "file_operations.json", "w", encoding="utf-8") as f:
-            json.dump(operations, f, indent=2, ensure_ascii=False)
+        参数:
+            无
+            
+        返回:
+            无
+        """
+        # 创建配置目录
+        config_dir = Path("db_config")
+        config_dir.mkdir(exist_ok=True)
         
-        # 导出维护计划
-        maintenance_plan = self.create_maintenance_plan()
-        with open(config_dir / "maintenance_plan.json", "w", encoding="utf-8") as f:
-            json.dump(maintenance_plan, f, indent=2, ensure_ascii=False)
+        await asyncio.gather(*(
+            asyncio.to_thread(self._write_json, config_dir / file_name, data)
+            for file_name, data in self._config_exports().items()
+        ))
         
         print(f"配置文件已导出到 {config_dir} 目录")
     
@@ -219,8 +321,8 @@ class DatabaseFilesystemManager:
         print("=" * 60)
         print("数据库文件系统管理器")
         print("=" * 60)
-        print(f"数据库路径: {self.db_path}")
-        print(f"备份目录: {self.backup_dir}")
+        print(f"数据库路径: {self._db_path_str}")
+        print(f"备份目录: {self._backup_dir_str}")
         print()
         print("主要功能:")
         print("1. 自动生成MCP配置文件")
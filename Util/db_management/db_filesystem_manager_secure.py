@@ -13,10 +13,38 @@
 
 import json
 import os
+import asyncio
 import datetime
+from functools import cached_property
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _write_payload(file_path: Path, payload: bytes):
+    """
+    直接通过文件描述符写入已编码的内容，不经过Python的缓冲层
+    
+    参数:
+        file_path (Path): 输出文件路径
+        payload (bytes): 要写入的内容
+        
+    返回:
+        无
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(file_path, flags, 0o666)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 
 class SecureDatabaseFilesystemManager:
     """
@@ -33,6 +61,9 @@ class SecureDatabaseFilesystemManager:
         """
         self.system_path_var = system_path_var
         self.actual_path = self._get_actual_path()
+        # 配置中使用的环境变量占位符，所有生成方法共用
+        self._ph = f"${{{system_path_var}}}"
+        self._ph_backup = self._ph + "/backup"
         
         if not self.actual_path:
             raise ValueError(f"环境变量 {system_path_var} 未设置")
@@ -53,9 +84,10 @@ class SecureDatabaseFilesystemManager:
         """
         return os.environ.get(self.system_path_var)
     
-    def generate_secure_mcp_config(self) -> Dict[str, Any]:
+    @cached_property
+    def secure_mcp_config(self) -> Dict[str, Any]:
         """
-        生成安全的MCP配置，使用环境变量而非真实路径
+        生成安全的MCP配置，使用环境变量而非真实路径（内容只取决于环境变量名，首次访问后缓存）
         
         参数:
             无
@@ -71,16 +103,29 @@ class SecureDatabaseFilesystemManager:
                     "args": [
                         "-y",
                         "@modelcontextprotocol/server-filesystem",
-                        f"${{{self.system_path_var}}}"  # 使用环境变量占位符
+                        self._ph  # 使用环境变量占位符
                     ]
                 }
             }
         }
         return config
     
-    def generate_secure_file_operations(self) -> list:
+    def generate_secure_mcp_config(self) -> Dict[str, Any]:
+        """
+        生成安全的MCP配置，使用环境变量而非真实路径，返回缓存的同一对象
+        
+        参数:
+            无
+            
+        返回:
+            Dict[str, Any]: 安全的MCP配置字典
+        """
+        return self.secure_mcp_config
+    
+    @cached_property
+    def secure_file_operations(self) -> list:
         """
-        生成安全的文件操作命令，使用环境变量占位符
+        生成安全的文件操作命令，使用环境变量占位符（内容只取决于环境变量名，首次访问后缓存）
         
         参数:
             无
@@ -93,37 +138,50 @@ class SecureDatabaseFilesystemManager:
                 "name": "获取数据库信息",
                 "tool": "get_file_info",
                 "params": {
-                    "path": f"${{{self.system_path_var}}}"  # 使用环境变量占位符
+                    "path": self._ph  # 使用环境变量占位符
                 }
             },
             {
                 "name": "创建备份目录",
                 "tool": "create_directory",
                 "params": {
-                    "path": f"${{{self.system_path_var}}}/backup"  # 使用环境变量占位符
+                    "path": self._ph_backup  # 使用环境变量占位符
                 }
             },
             {
                 "name": "列出数据库目录",
                 "tool": "list_directory",
                 "params": {
-                    "path": f"${{{self.system_path_var}}}"  # 使用环境变量占位符
+                    "path": self._ph  # 使用环境变量占位符
                 }
             },
             {
                 "name": "搜索数据库文件",
                 "tool": "search_files",
                 "params": {
-                    "path": f"${{{self.system_path_var}}}",  # 使用环境变量占位符
+                    "path": self._ph,  # 使用环境变量占位符
                     "pattern": "*.mdb"
                 }
             }
         ]
         return operations
     
-    def create_backup_strategy(self) -> Dict[str, Any]:
+    def generate_secure_file_operations(self) -> list:
+        """
+        生成安全的文件操作命令，使用环境变量占位符，返回缓存的同一对象
+        
+        参数:
+            无
+            
+        返回:
+            list: 安全的文件操作命令列表
         """
-        创建备份策略配置
+        return self.secure_file_operations
+    
+    @cached_property
+    def backup_strategy(self) -> Dict[str, Any]:
+        """
+        创建备份策略配置（内容只取决于环境变量名，首次访问后缓存）
         
         参数:
             无
@@ -145,15 +203,28 @@ class SecureDatabaseFilesystemManager:
                 "weekly_time": "03:00"
             },
             "backup_paths": {
-                "source_path": f"${{{self.system_path_var}}}",  # 使用环境变量占位符
-                "backup_dir": f"${{{self.system_path_var}}}/backup"  # 使用环境变量占位符
+                "source_path": self._ph,  # 使用环境变量占位符
+                "backup_dir": self._ph_backup  # 使用环境变量占位符
             }
         }
         return strategy
     
-    def create_maintenance_plan(self) -> Dict[str, Any]:
+    def create_backup_strategy(self) -> Dict[str, Any]:
         """
-        创建数据库维护计划
+        创建备份策略配置，返回缓存的同一对象
+        
+        参数:
+            无
+            
+        返回:
+            Dict[str, Any]: 备份策略配置
+        """
+        return self.backup_strategy
+    
+    @cached_property
+    def maintenance_plan(self) -> Dict[str, Any]:
+        """
+        创建数据库维护计划（内容只取决于环境变量名，首次访问后缓存）
         
         参数:
             无
@@ -178,12 +249,24 @@ class SecureDatabaseFilesystemManager:
                 "备份恢复测试"
             ],
             "maintenance_paths": {
-                "db_path": f"${{{self.system_path_var}}}",  # 使用环境变量占位符
-                "backup_path": f"${{{self.system_path_var}}}/backup"  # 使用环境变量占位符
+                "db_path": self._ph,  # 使用环境变量占位符
+                "backup_path": self._ph_backup  # 使用环境变量占位符
             }
         }
         return plan
     
+    def create_maintenance_plan(self) -> Dict[str, Any]:
+        """
+        创建数据库维护计划，返回缓存的同一对象
+        
+        参数:
+            无
+            
+        返回:
+            Dict[str, Any]: 维护计划
+        """
+        return self.maintenance_plan
+    
     def generate_env_var_template(self) -> Dict[str, str]:
         """
         生成环境变量设置模板
@@ -204,6 +287,33 @@ class SecureDatabaseFilesystemManager:
         }
         return template
     
+    def _secure_config_payloads(self) -> Dict[str, bytes]:
+        """
+        生成所有待导出配置文件的JSON内容，序列化在写入前一次完成
+        
+        参数:
+            无
+            
+        返回:
+            Dict[str, bytes]: 文件名到UTF-8编码JSON内容的映射
+        """
+        exports = {
+            "mcp_config.json": self.secure_mcp_config,
+            "backup_strategy.json": self.backup_strategy,
+            "file_operations.json": self.secure_file_operations,
+            "maintenance_plan.json": self.maintenance_plan,
+            "env_var_template.json": self.generate_env_var_template()
+        }
+        if orjson is not None:
+            return {
+                file_name: orjson.dumps(data, option=orjson.OPT_INDENT_2)
+                for file_name, data in exports.items()
+            }
+        return {
+            file_name: json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+            for file_name, data in exports.items()
+        }
+    
     def export_secure_config_files(self):
         """
         导出所有安全的配置文件
@@ -218,30 +328,29 @@ class SecureDatabaseFilesystemManager:
         config_dir = Path("db_config_secure")
         config_dir.mkdir(exist_ok=True)
         
-        # 导出安全的MCP配置
-        mcp_config = self.generate_secure_mcp_config()
-        with open(config_dir / "mcp_config.json", "w", encoding="utf-8") as f:
-            json.dump(mcp_config, f, indent=2, ensure_ascii=False)
-        
-        # 导出备份策略
-        backup_strategy = self.create_backup_strategy()
-        with open(config_dir / "backup_strategy.json", "w", encoding="utf-8") as f:
-            json.dump(backup_strategy, f, indent=2, ensure_ascii=False)
+        for file_name, payload in self._secure_config_payloads().items():
+            _write_payload(config_dir / file_name, payload)
         
-        # 导出安全的文件操作命令
-        operations = self.generate_secure_file_operations()
-        with open(config_dir / "file_operations.json", "w", encoding="utf-8") as f:
-            json.dump(operations, f, indent=2, ensure_ascii=False)
+        print(f"安全配置文件已导出到 {config_dir} 目录")
+    
+    async def export_secure_config_files_async(self):
+        """
+        异步导出所有安全的配置文件，各文件在线程池中并发写入
         
-        # 导出维护计划
-        maintenance_plan = self.create_maintenance_plan()
-        with open(config_dir / "maintenance_plan.json", "w", encoding="utf-8") as f:
-            json.dump(maintenance_plan, f, indent=2, ensure_ascii=False)
+        参数:
+            无
+            
+        返回:
+            无
+        """
+        # 创建配置目录
+        config_dir = Path("db_config_secure")
+        config_dir.mkdir(exist_ok=True)
         
-        # 导出环境变量模板
-        env_template = self.generate_env_var_template()
-        with open(config_dir / "env_var_template.json", "w", encoding="utf-8") as f:
-            json.dump(env_template, f, indent=2, ensure_ascii=False)
+        await asyncio.gather(*(
+            asyncio.to_thread(_write_payload, config_dir / file_name, payload)
+            for file_name, payload in self._secure_config_payloads().items()
+        ))
         
         print(f"安全配置文件已导出到 {config_dir} 目录")
     
@@ -12,11 +12,29 @@ db_lists.txt 解析器
 """
 
 import os
-import re
 import json
 import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 配置行格式: mcp_server:${mcp_server_name}|${system_path_var}
+_LINE_PREFIX = 'mcp_server:'
+# 支持的数据库文件扩展名
+_VALID_DB_EXTS = frozenset({'.mdb', '.accdb', '.db', '.sqlite', '.sqlite3',
+                            '.db3', '.dbf', '.csv', '.json', '.xml'})
+# 已知MCP服务器的启动参数模板，未列出的服务器使用通用模板
+_MCP_ARGS = {
+    "filesystem": lambda path: ["-y", "@modelcontextprotocol/server-filesystem", path],
+    "sqlite": lambda path: ["-y", "@modelcontextprotocol/server-sqlite", "--db-path", path],
+    "postgres": lambda path: ["-y", "@modelcontextprotocol/server-postgres", path],
+}
 
 
 class DBListsParser:
@@ -35,6 +53,8 @@ class DBListsParser:
         self.db_lists_path = Path(db_lists_path)
         self.configs = []
         self.logger = self._setup_logger()
+        self._resolved_cache = None
+        self._validated_cache = None
     
     def _setup_logger(self) -> logging.Logger:
         """
@@ -69,6 +89,8 @@ class DBListsParser:
         返回:
             List[Dict[str, str]]: 配置列表，每个配置包含mcp_server和system_path_var
         """
+        self.invalidate()
+        
         if not self.db_lists_path.exists():
             self.logger.error(f"文件 {self.db_lists_path} 不存在")
             return []
@@ -76,20 +98,26 @@ class DBListsParser:
         configs = []
         
         try:
-            with open(self.db_lists_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                
-                # 跳过空行和注释行
-                if not line or line.startswith('#'):
-                    continue
+            # 按行流式读取字节，空行和注释行无需解码
+            with open(self.db_lists_path, 'rb', buffering=131072) as f:
+                # 再按 \n、\r、\r\n 切分，行号与文本模式的通用换行保持一致
+                lines = itertools.chain.from_iterable(chunk.splitlines() for chunk in f)
                 
-                # 解析配置行
-                config = self._parse_line(line, line_num)
-                if config:
-                    configs.append(config)
+                for line_num, raw in enumerate(lines, 1):
+                    raw = raw.strip()
+                    if not raw or raw.startswith(b'#'):
+                        continue
+                    
+                    line = raw.decode('utf-8').strip()
+                    
+                    # 跳过空行和注释行
+                    if not line or line.startswith('#'):
+                        continue
+                    
+                    # 解析配置行
+                    config = self._parse_line(line, line_num)
+                    if config:
+                        configs.append(config)
             
             self.configs = configs
             self.logger.info(f"成功解析 {len(configs)} 个配置")
@@ -99,6 +127,19 @@ class DBListsParser:
             self.logger.error(f"解析文件失败: {e}")
             return []
     
+    def invalidate(self):
+        """
+        清除路径解析和验证结果的缓存，环境变量或文件内容变化后调用
+        
+        参数:
+            无
+            
+        返回:
+            无
+        """
+        self._resolved_cache = None
+        self._validated_cache = None
+    
     def _parse_line(self, line: str, line_num: int) -> Optional[Dict[str, str]]:
         """
         解析单行配置
@@ -111,19 +152,21 @@ class DBListsParser:
             Optional[Dict[str, str]]: 解析结果，失败返回None
         """
         # 匹配格式: mcp_server:${mcp_server_name}|${system_path_var}
-        pattern = r'mcp_server:([^|]+)\|(.+)'
-        match = re.match(pattern, line)
+        if line.startswith(_LINE_PREFIX):
+            mcp_server, sep, system_path_var = line[len(_LINE_PREFIX):].partition('|')
+        else:
+            sep = ''
         
-        if not match:
-            self.logger.warning(f"第{line_num}行格式无效: {line}")
+        if not sep or not mcp_server or not system_path_var:
+            self.logger.warning("第%d行格式无效: %s", line_num, line)
             return None
         
-        mcp_server = match.group(1).strip()
-        system_path_var = match.group(2).strip()
+        mcp_server = mcp_server.strip()
+        system_path_var = system_path_var.strip()
         
         # 验证环境变量格式
         if not self._validate_env_var_name(system_path_var):
-            self.logger.warning(f"第{line_num}行环境变量名无效: {system_path_var}")
+            self.logger.warning("第%d行环境变量名无效: %s", line_num, system_path_var)
             return None
         
         config = {
@@ -133,7 +176,7 @@ class DBListsParser:
             'raw_line': line
         }
         
-        self.logger.debug(f"解析配置: {mcp_server} -> {system_path_var}")
+        self.logger.debug("解析配置: %s -> %s", mcp_server, system_path_var)
         return config
     
     def _validate_env_var_name(self, var_name: str) -> bool:
@@ -147,59 +190,101 @@ class DBListsParser:
             bool: 是否有效
         """
         # 环境变量名称规则：字母、数字、下划线，不能以数字开头
-        pattern = r'^[A-Za-z_][A-Za-z0-9_]*$'
-        return bool(re.match(pattern, var_name))
+        # 对纯ASCII字符串，isidentifier() 的规则与此完全一致
+        return var_name.isascii() and var_name.isidentifier()
     
-    def resolve_paths(self) -> List[Dict[str, str]]:
+    def _resolve_and_validate(self) -> Iterator[Tuple[Dict[str, str], List[str]]]:
         """
-        解析环境变量引用的实际路径
+        一次遍历完成环境变量解析和配置验证
         
         参数:
             无
             
         返回:
-            List[Dict[str, str]]: 包含实际路径的配置列表
+            Iterator[Tuple[Dict[str, str], List[str]]]: 逐个产出(包含实际路径的配置, 问题列表)
         """
         if not self.configs:
             self.parse_file()
         
-        resolved_configs = []
+        # 获取环境变量值，多个配置共用同一变量时只读取一次
+        var_names = dict.fromkeys(config['system_path_var'] for config in self.configs)
+        env_values = {var_name: self._get_env_var_value(var_name) for var_name in var_names}
+        actual_paths = [env_values[config['system_path_var']] for config in self.configs]
         
-        for config in self.configs:
+        # 各路径的文件系统检查相互独立，多个路径时并发执行以重叠I/O等待
+        unique_paths = list(dict.fromkeys(path for path in actual_paths if path))
+        if len(unique_paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(32, len(unique_paths))) as executor:
+                path_checks = dict(zip(unique_paths, executor.map(self._check_path, unique_paths)))
+        else:
+            path_checks = {path: self._check_path(path) for path in unique_paths}
+        
+        for config, actual_path in zip(self.configs, actual_paths):
             mcp_server = config['mcp_server']
             system_path_var = config['system_path_var']
+            issues = []
             
-            # 获取环境变量值
-            actual_path = self._get_env_var_value(system_path_var)
+            if actual_path:
+                path_exists, path_issue = path_checks[actual_path]
+                self.logger.info("%s: %s -> %s", mcp_server, system_path_var, actual_path)
+                
+                # 检查路径是否存在
+                if not path_exists:
+                    issues.append(f"路径 {actual_path} 不存在")
+                elif path_issue:
+                    issues.append(path_issue)
+            else:
+                path_exists = False
+                self.logger.warning("%s: 环境变量 %s 未设置", mcp_server, system_path_var)
+                issues.append(f"环境变量 {system_path_var} 未设置")
             
             resolved_config = {
                 'mcp_server': mcp_server,
                 'system_path_var': system_path_var,
                 'actual_path': actual_path,
-                'path_exists': Path(actual_path).exists() if actual_path else False,
+                'path_exists': path_exists,
                 'line_num': config['line_num']
             }
+            yield resolved_config, issues
+    
+    def _build_resolved(self):
+        """
+        执行解析和验证，同时填充resolve_paths和validate_configs的缓存
+        
+        参数:
+            无
             
-            resolved_configs.append(resolved_config)
-            
-            if actual_path:
-                self.logger.info(f"{mcp_server}: {system_path_var} -> {actual_path}")
+        返回:
+            无
+        """
+        resolved_configs = []
+        valid_configs = []
+        invalid_configs = []
+        
+        for config, issues in self._resolve_and_validate():
+            resolved_configs.append(config)
+            if issues:
+                # 复制一份再记录问题，避免修改resolve_paths的缓存结果
+                invalid_configs.append(dict(config, issues=issues))
             else:
-                self.logger.warning(f"{mcp_server}: 环境变量 {system_path_var} 未设置")
+                valid_configs.append(config)
         
-        return resolved_configs
+        self._resolved_cache = resolved_configs
+        self._validated_cache = (valid_configs, invalid_configs)
     
-    def _get_env_var_value(self, var_name: str) -> Optional[str]:
+    def resolve_paths(self) -> List[Dict[str, str]]:
         """
-        获取环境变量值
+        解析环境变量引用的实际路径
         
         参数:
-            var_name (str): 环境变量名称
+            无
             
         返回:
-            Optional[str]: 环境变量值，不存在返回None
+            List[Dict[str, str]]: 包含实际路径的配置列表，结果会被缓存直到重新解析或调用invalidate()
         """
-        return os.environ.get(var_name)
+        if self._resolved_cache is None:
+            self._build_resolved()
+        return self._resolved_cache
     
     def validate_configs(self) -> Tuple[List[Dict], List[Dict]]:
         """
@@ -209,42 +294,46 @@ class DBListsParser:
             无
             
         返回:
-            Tuple[List[Dict], List[Dict]]: (有效配置列表, 无效配置列表)
+            Tuple[List[Dict], List[Dict]]: (有效配置列表, 无效配置列表)，结果会被缓存直到重新解析或调用invalidate()
         """
-        resolved_configs = self.resolve_paths()
-        
-        valid_configs = []
-        invalid_configs = []
+        if self._validated_cache is None:
+            self._build_resolved()
+        return self._validated_cache
+    
+    def _check_path(self, actual_path: str) -> Tuple[bool, Optional[str]]:
+        """
+        检查单个路径是否存在，以及作为数据库文件或目录是否可用
         
-        for config in resolved_configs:
-            issues = []
-            
-            # 检查环境变量是否设置
-            if not config['actual_path']:
-                issues.append(f"环境变量 {config['system_path_var']} 未设置")
-            else:
-                # 检查路径是否存在
-                if not config['path_exists']:
-                    issues.append(f"路径 {config['actual_path']} 不存在")
-                else:
-                    # 检查是否为文件
-                    path = Path(config['actual_path'])
-                    if path.is_file():
-                        # 检查文件扩展名
-                        if not self._is_valid_db_file(path):
-                            issues.append(f"文件类型不支持: {path.suffix}")
-                    elif path.is_dir():
-                        # 检查目录是否包含数据库文件
-                        if not self._contains_db_files(path):
-                            issues.append("目录中未找到数据库文件")
+        参数:
+            actual_path (str): 实际路径
             
-            if issues:
-                config['issues'] = issues
-                invalid_configs.append(config)
-            else:
-                valid_configs.append(config)
+        返回:
+            Tuple[bool, Optional[str]]: (路径是否存在, 问题描述，无问题时为None)
+        """
+        path = Path(actual_path)
+        if path.is_file():
+            # 检查文件扩展名
+            if not self._is_valid_db_file(path):
+                return True, f"文件类型不支持: {path.suffix}"
+            return True, None
+        if path.is_dir():
+            # 检查目录是否包含数据库文件
+            if not self._contains_db_files(path):
+                return True, "目录中未找到数据库文件"
+            return True, None
+        return path.exists(), None
+    
+    def _get_env_var_value(self, var_name: str) -> Optional[str]:
+        """
+        获取环境变量值
         
-        return valid_configs, invalid_configs
+        参数:
+            var_name (str): 环境变量名称
+            
+        返回:
+            Optional[str]: 环境变量值，不存在返回None
+        """
+        return os.environ.get(var_name)
     
     def _is_valid_db_file(self, file_path: Path) -> bool:
         """
@@ -256,9 +345,7 @@ class DBListsParser:
         返回:
             bool: 是否有效
         """
-        valid_extensions = {'.mdb', '.accdb', '.db', '.sqlite', '.sqlite3', 
-                           '.db3', '.dbf', '.csv', '.json', '.xml'}
-        return file_path.suffix.lower() in valid_extensions
+        return file_path.suffix.lower() in _VALID_DB_EXTS
     
     def _contains_db_files(self, dir_path: Path) -> bool:
         """
@@ -271,24 +358,27 @@ class DBListsParser:
             bool: 是否包含数据库文件
         """
         try:
-            for file_path in dir_path.iterdir():
-                if file_path.is_file() and self._is_valid_db_file(file_path):
-                    return True
+            # DirEntry.is_file() 直接使用目录项中的类型信息，无需逐个stat
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if os.path.splitext(entry.name)[1].lower() in _VALID_DB_EXTS and entry.is_file():
+                        return True
             return False
         except Exception:
             return False
     
-    def generate_mcp_configs(self) -> List[Dict[str, str]]:
+    def generate_mcp_configs(self, valid_configs: Optional[List[Dict]] = None) -> List[Dict[str, str]]:
         """
         生成MCP服务器配置
         
         参数:
-            无
+            valid_configs (Optional[List[Dict]]): 已验证的有效配置，为None时自动调用validate_configs()
             
         返回:
             List[Dict[str, str]]: MCP配置列表
         """
-        valid_configs, _ = self.validate_configs()
+        if valid_configs is None:
+            valid_configs, _ = self.validate_configs()
         mcp_configs = []
         
         for config in valid_configs:
@@ -317,41 +407,32 @@ class DBListsParser:
         返回:
             Optional[Dict]: MCP配置，失败返回None
         """
-        if mcp_server == "filesystem":
-            return {
-                "command": "npx",
-                "args": ["-y", "@modelcontextprotocol/server-filesystem", path]
-            }
-        elif mcp_server == "sqlite":
-            return {
-                "command": "npx",
-                "args": ["-y", "@modelcontextprotocol/server-sqlite", "--db-path", path]
-            }
-        elif mcp_server == "postgres":
-            return {
-                "command": "npx",
-                "args": ["-y", "@modelcontextprotocol/server-postgres", path]
-            }
+        build_args = _MCP_ARGS.get(mcp_server)
+        if build_args is not None:
+            args = build_args(path)
         else:
             # 通用配置模板
-            return {
-                "command": "npx",
-                "args": ["-y", f"@modelcontextprotocol/server-{mcp_server}", path]
-            }
+            args = ["-y", f"@modelcontextprotocol/server-{mcp_server}", path]
+        
+        return {
+            "command": "npx",
+            "args": args
+        }
     
-    def export_config(self, output_file: str = "mcp_configs.json") -> bool:
+    def export_config(self, output_file: str = "mcp_configs.json", pretty: bool = True) -> bool:
         """
         导出配置到文件
         
         参数:
             output_file (str): 输出文件路径，默认为"mcp_configs.json"
+            pretty (bool): 是否缩进排版，供程序读取时可设为False输出紧凑格式
             
         返回:
             bool: 是否成功导出
         """
         try:
             valid_configs, invalid_configs = self.validate_configs()
-            mcp_configs = self.generate_mcp_configs()
+            mcp_configs = self.generate_mcp_configs(valid_configs)
             
             export_data = {
                 "valid_configs": valid_configs,
@@ -365,8 +446,15 @@ class DBListsParser:
                 }
             }
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            # 先完整编码再以二进制方式一次写入，绕过文本层的增量编码
+            if orjson is not None:
+                payload = orjson.dumps(export_data, option=orjson.OPT_INDENT_2 if pretty else None)
+            elif pretty:
+                payload = json.dumps(export_data, indent=2, ensure_ascii=False).encode('utf-8')
+            else:
+                payload = json.dumps(export_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            with open(output_file, 'wb', buffering=131072) as f:
+                f.write(payload)
             
             self.logger.info(f"配置已导出到 {output_file}")
             return True
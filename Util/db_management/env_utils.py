@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+环境变量辅助工具
+供数据库配置工具的测试脚本临时设置环境变量
+
+参数:
+    无
+
+返回:
+    无
+"""
+
+import os
+import contextlib
+
+
+@contextlib.contextmanager
+def temp_environ(**values):
+    """
+    临时设置环境变量，离开代码块时恢复原值（包括异常退出）
+
+    参数:
+        **values: 环境变量名与值
+
+    返回:
+        无
+    """
+    old_values = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in old_values.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
@@ -41,7 +41,7 @@ def test_db_lists_parser():
     
     测试依赖:
     - db_lists_parser.py 模块
-    - 临时测试文件 test_db_lists.txt
+    - 临时目录中的测试文件 test_db_lists.txt
     
     前置条件:
     - 测试环境中Python模块导入路径正确配置
@@ -56,49 +56,45 @@ mcp_server:filesystem|TEST_DB_PATH
 mcp_server:sqlite|TEST_SQLITE_PATH
 """
     
-    with open("test_db_lists.txt", "w", encoding="utf-8") as f:
-        f.write(test_content)
-    
     try:
-        # 测试解析功能
-        from db_lists_parser import DBListsParser
-        
-        parser = DBListsParser("test_db_lists.txt")
-        configs = parser.parse_file()
-        
-        print(f"解析到 {len(configs)} 个配置:")
-        for config in configs:
-            print(f"  - MCP服务器: {config['mcp_server']}")
-            print(f"    环境变量: {config['system_path_var']}")
-        
-        # 测试环境变量解析
-        os.environ["TEST_DB_PATH"] = "/tmp/test.db"
-        resolved_configs = parser.resolve_paths()
-        
-        print(f"\n解析环境变量:")
-        for config in resolved_configs:
-            print(f"  - {config['mcp_server']}: {config.get('actual_path', '未设置')}")
-        
-        # 测试验证功能
-        valid_configs, invalid_configs = parser.validate_configs()
-        print(f"\n有效配置: {len(valid_configs)}")
-        print(f"无效配置: {len(invalid_configs)}")
-        
-        if invalid_configs:
-            print("无效配置详情:")
-            for config in invalid_configs:
-                print(f"  - {config['mcp_server']}: {config.get('issues', [])}")
-        
-        print("✓ db_lists_parser.py 测试通过")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_file = Path(tmp_dir) / "test_db_lists.txt"
+            test_file.write_text(test_content, encoding="utf-8")
+            
+            # 测试解析功能
+            from db_lists_parser import DBListsParser
+            from env_utils import temp_environ
+            
+            parser = DBListsParser(str(test_file))
+            configs = parser.parse_file()
+            
+            print(f"解析到 {len(configs)} 个配置:")
+            for config in configs:
+                print(f"  - MCP服务器: {config['mcp_server']}")
+                print(f"    环境变量: {config['system_path_var']}")
+            
+            # 测试环境变量解析
+            with temp_environ(TEST_DB_PATH="/tmp/test.db"):
+                resolved_configs = parser.resolve_paths()
+                
+                print(f"\n解析环境变量:")
+                for config in resolved_configs:
+                    print(f"  - {config['mcp_server']}: {config.get('actual_path', '未设置')}")
+                
+                # 测试验证功能
+                valid_configs, invalid_configs = parser.validate_configs()
+                print(f"\n有效配置: {len(valid_configs)}")
+                print(f"无效配置: {len(invalid_configs)}")
+                
+                if invalid_configs:
+                    print("无效配置详情:")
+                    for config in invalid_configs:
+                        print(f"  - {config['mcp_server']}: {config.get('issues', [])}")
+            
+            print("✓ db_lists_parser.py 测试通过")
         
     except Exception as e:
         print(f"✗ db_lists_parser.py 测试失败: {e}")
-    finally:
-        # 清理测试文件
-        if os.path.exists("test_db_lists.txt"):
-            os.remove("test_db_lists.txt")
-        if "TEST_DB_PATH" in os.environ:
-            del os.environ["TEST_DB_PATH"]
 
 
 def test_set_system_path_var():
@@ -118,7 +114,7 @@ def test_set_system_path_var():
     
     测试依赖:
     - set_SystemPathVar.py 模块
-    - 临时测试配置文件 db_path_config.json
+    - 临时目录中的测试配置文件 db_path_config.json
     
     前置条件:
     - 测试环境中Python模块导入路径正确配置
@@ -129,53 +125,51 @@ def test_set_system_path_var():
     print("=" * 60)
     
     try:
-        from set_SystemPathVar import SystemPathVarManager
-        
-        manager = SystemPathVarManager()
-        
-        # 测试环境变量名称生成
-        var_name = manager.generate_random_var_name()
-        print(f"生成的环境变量名: {var_name}")
-        
-        # 测试环境变量设置（仅测试，不实际设置系统变量）
-        test_var = "TEST_VAR_12345"
-        test_value = "/tmp/test/path"
-        
-        # 测试获取环境变量
-        os.environ[test_var] = test_value
-        retrieved_value = manager.get_env_var(test_var)
-        
-        if retrieved_value == test_value:
-            print(f"✓ 环境变量获取功能正常: {test_var} = {retrieved_value}")
-        else:
-            print(f"✗ 环境变量获取失败")
-        
-        # 测试配置保存和加载
-        test_config = {
-            "test_db": {
-                "var_name": test_var,
-                "db_path": test_value,
-                "created_at": "2025-01-01T00:00:00"
-            }
-        }
-        
-        success = manager.save_config(test_config)
-        if success:
-            loaded_config = manager.load_existing_config()
-            if loaded_config.get("test_db", {}).get("var_name") == test_var:
-                print("✓ 配置保存和加载功能正常")
-            else:
-                print("✗ 配置加载验证失败")
-        else:
-            print("✗ 配置保存失败")
-        
-        # 清理测试配置
-        if os.path.exists("db_path_config.json"):
-            os.remove("db_path_config.json")
-        if test_var in os.environ:
-            del os.environ[test_var]
-        
-        print("✓ set_SystemPathVar.py 测试通过")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            from set_SystemPathVar import SystemPathVarManager
+            from env_utils import temp_environ
+            
+            manager = SystemPathVarManager()
+            # 配置写入临时目录，避免覆盖工作目录中的 db_path_config.json
+            manager.config_file = Path(tmp_dir) / "db_path_config.json"
+            
+            # 测试环境变量名称生成
+            var_name = manager.generate_random_var_name()
+            print(f"生成的环境变量名: {var_name}")
+            
+            # 测试环境变量设置（仅测试，不实际设置系统变量）
+            test_var = "TEST_VAR_12345"
+            test_value = "/tmp/test/path"
+            
+            # 测试获取环境变量
+            with temp_environ(**{test_var: test_value}):
+                retrieved_value = manager.get_env_var(test_var)
+                
+                if retrieved_value == test_value:
+                    print(f"✓ 环境变量获取功能正常: {test_var} = {retrieved_value}")
+                else:
+                    print(f"✗ 环境变量获取失败")
+                
+                # 测试配置保存和加载
+                test_config = {
+                    "test_db": {
+                        "var_name": test_var,
+                        "db_path": test_value,
+                        "created_at": "2025-01-01T00:00:00"
+                    }
+                }
+                
+                success = manager.save_config(test_config)
+                if success:
+                    loaded_config = manager.load_existing_config()
+                    if loaded_config.get("test_db", {}).get("var_name") == test_var:
+                        print("✓ 配置保存和加载功能正常")
+                    else:
+                        print("✗ 配置加载验证失败")
+                else:
+                    print("✗ 配置保存失败")
+            
+            print("✓ set_SystemPathVar.py 测试通过")
         
     except Exception as e:
         print(f"✗ set_SystemPathVar.py 测试失败: {e}")
@@ -272,7 +266,7 @@ def test_integration():
     
     测试依赖:
     - db_lists_parser.py 模块
-    - 临时测试文件 test_integration_db_lists.txt
+    - 临时目录中的测试文件 test_integration_db_lists.txt
     
     前置条件:
     - 测试环境中Python模块导入路径正确配置
@@ -283,50 +277,44 @@ def test_integration():
     print("=" * 60)
     
     try:
-        # 创建完整的测试场景
-        test_db_path = "/tmp/test_integration.db"
-        
-        # 1. 创建测试用的 db_lists.txt
-        test_content = f"mcp_server:filesystem|TEST_INTEGRATION_DB\n"
-        with open("test_integration_db_lists.txt", "w", encoding="utf-8") as f:
-            f.write(test_content)
-        
-        # 2. 设置环境变量
-        os.environ["TEST_INTEGRATION_DB"] = test_db_path
-        
-        # 3. 使用解析器解析
-        from db_lists_parser import DBListsParser
-        parser = DBListsParser("test_integration_db_lists.txt")
-        configs = parser.parse_file()
-        
-        if configs:
-            print("✓ 配置解析成功")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # 创建完整的测试场景
+            test_db_path = "/tmp/test_integration.db"
+            
+            # 1. 创建测试用的 db_lists.txt
+            test_file = Path(tmp_dir) / "test_integration_db_lists.txt"
+            test_content = f"mcp_server:filesystem|TEST_INTEGRATION_DB\n"
+            test_file.write_text(test_content, encoding="utf-8")
             
-            # 4. 验证配置
-            resolved = parser.resolve_paths()
-            if resolved and resolved[0].get('actual_path') == test_db_path:
-                print("✓ 环境变量解析成功")
+            # 2. 设置环境变量（离开代码块时自动恢复）
+            from env_utils import temp_environ
+            with temp_environ(TEST_INTEGRATION_DB=test_db_path):
+                # 3. 使用解析器解析
+                from db_lists_parser import DBListsParser
+                parser = DBListsParser(str(test_file))
+                configs = parser.parse_file()
                 
-                # 5. 生成MCP配置
-                mcp_configs = parser.generate_mcp_configs()
-                if mcp_configs:
-                    print("✓ MCP配置生成成功")
-                    print(f"  配置: {mcp_configs[0]['config']}")
+                if configs:
+                    print("✓ 配置解析成功")
+                
+                    # 4. 验证配置
+                    resolved = parser.resolve_paths()
+                    if resolved and resolved[0].get('actual_path') == test_db_path:
+                        print("✓ 环境变量解析成功")
+                
+                        # 5. 生成MCP配置
+                        mcp_configs = parser.generate_mcp_configs()
+                        if mcp_configs:
+                            print("✓ MCP配置生成成功")
+                            print(f"  配置: {mcp_configs[0]['config']}")
+                        else:
+                            print("✗ MCP配置生成失败")
+                    else:
+                        print("✗ 环境变量解析失败")
                 else:
-                    print("✗ MCP配置生成失败")
-            else:
-                print("✗ 环境变量解析失败")
-        else:
-            print("✗ 配置解析失败")
-        
-        # 清理测试文件
-        for file in ["test_integration_db_lists.txt"]:
-            if os.path.exists(file):
-                os.remove(file)
-        if "TEST_INTEGRATION_DB" in os.environ:
-            del os.environ["TEST_INTEGRATION_DB"]
-        
-        print("✓ 集成测试通过")
+                    print("✗ 配置解析失败")
+            
+            print("✓ 集成测试通过")
         
     except Exception as e:
         print(f"✗ 集成测试失败: {e}")
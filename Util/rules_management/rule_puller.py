@@ -8,6 +8,8 @@ AI项目规则文件拉取脚本
 import os
 import sys
 import json
+import time
+import shutil
 import hashlib
 import urllib.request
 import urllib.error
@@ -25,9 +27,21 @@ logging.basicConfig(
     ]
 )
 
+# 规则配置默认值
+_DEFAULT_CONFIG = {
+    "last_update": None,
+    "current_version": None,
+    "auto_sync": True,
+    "sync_interval_hours": 72
+}
+
 class RulePuller:
     """规则文件拉取器"""
     
+    USER_AGENT = 'ai-project-rules-puller'
+    DOWNLOAD_TIMEOUT = 30  # 秒，避免网络挂起时阻塞更新流程
+    DOWNLOAD_CHUNK_SIZE = 1 << 20
+    
     def __init__(self, repo_url, local_path):
         """
         初始化拉取器
@@ -49,24 +63,130 @@ class RulePuller:
         base_url = self.repo_url.replace('github.com', 'raw.githubusercontent.com')
         return f"{base_url}/master/{filename}"
         
-    def download_file(self, url, local_file):
-        """下载文件"""
+    def download_file(self, url, local_file, config=None):
+        """
+        下载文件
+        
+        参数：
+            url: 文件URL
+            local_file: 保存路径
+            config: 规则配置，其中记录了etag/last_modified且本地文件自上次同步后未变动时发送条件请求
+            
+        返回：
+            dict: {"status": 200或304, "etag": ..., "last_modified": ..., "sha256": ..., "size": ...}，失败返回None
+                  下载内容的SHA-256与写入字节数在写入的同时计算，304时为None
+        """
+        headers = {"User-Agent": self.USER_AGENT}
+        # 本地文件被编辑过时不能发送条件请求，否则304会让本地修改无法被远端内容覆盖
+        if config and self._local_unchanged(config):
+            if config.get("etag"):
+                headers["If-None-Match"] = config["etag"]
+            if config.get("last_modified"):
+                headers["If-Modified-Since"] = config["last_modified"]
+        
         try:
             logging.info(f"正在下载: {url}")
-            urllib.request.urlretrieve(url, local_file)
-            return True
+            request = urllib.request.Request(url, headers=headers)
+            digest = hashlib.sha256()
+            size = 0
+            with urllib.request.urlopen(request, timeout=self.DOWNLOAD_TIMEOUT) as response, \
+                    open(local_file, 'wb', buffering=self.DOWNLOAD_CHUNK_SIZE) as f:
+                while chunk := response.read(self.DOWNLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    size += f.write(chunk)
+                return {
+                    "status": response.status,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "sha256": digest.hexdigest(),
+                    "size": size
+                }
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                # 远端未修改，无需下载
+                return {
+                    "status": 304,
+                    "etag": e.headers.get("ETag") or config.get("etag"),
+                    "last_modified": e.headers.get("Last-Modified") or config.get("last_modified"),
+                    "sha256": None,
+                    "size": None
+                }
+            logging.error(f"下载失败: {e}")
+            return None
         except urllib.error.URLError as e:
             logging.error(f"下载失败: {e}")
-            return False
+            return None
+        except OSError as e:
+            # 读取超时或写入本地文件失败
+            logging.error(f"下载失败: {e}")
+            return None
             
-    def calculate_md5(self, filepath):
-        """计算文件MD5"""
-        hash_md5 = hashlib.md5()
+    def calculate_sha256(self, filepath):
+        """
+        计算文件SHA-256（可使用CPU的SHA指令加速）
+        
+        参数：
+            filepath: 文件路径
+            
+        返回：
+            str: 十六进制摘要
+        """
         with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            
+            # Python 3.11 以下：复用同一块缓冲区读取，避免每块重新分配
+            digest = hashlib.sha256()
+            buf = bytearray(1 << 20)
+            view = memoryview(buf)
+            while n := f.readinto(buf):
+                digest.update(view[:n])
+            return digest.hexdigest()
+        
+    def _local_unchanged(self, config):
+        """
+        判断本地规则文件自上次记录以来是否未变动（修改时间和大小均一致）
         
+        参数：
+            config: 规则配置
+            
+        返回：
+            bool: 文件存在且与记录一致时返回True
+        """
+        try:
+            st = self.local_path.stat()
+        except OSError:
+            return False
+        return (config.get("local_mtime_ns") == st.st_mtime_ns
+                and config.get("local_size") == st.st_size)
+    
+    def _local_sha256(self, config):
+        """
+        获取本地规则文件的SHA-256，文件未变动时直接使用配置中记录的值
+        
+        参数：
+            config: 规则配置
+            
+        返回：
+            str: 十六进制摘要
+        """
+        if config.get("current_sha256") and self._local_unchanged(config):
+            return config["current_sha256"]
+        return self.calculate_sha256(self.local_path)
+    
+    def _record_local_state(self, config, sha256):
+        """
+        在配置中记录本地规则文件的摘要及对应的修改时间和大小
+        
+        参数：
+            config: 规则配置
+            sha256: 本地规则文件的SHA-256
+        """
+        st = self.local_path.stat()
+        config["current_sha256"] = sha256
+        config["local_mtime_ns"] = st.st_mtime_ns
+        config["local_size"] = st.st_size
+    
     def backup_current_rules(self):
         """备份当前规则文件"""
         if not self.local_path.exists():
@@ -76,8 +196,12 @@ class RulePuller:
         backup_file = self.backup_dir / f"project_rules_backup_{timestamp}.md"
         
         try:
-            import shutil
-            shutil.copy2(self.local_path, backup_file)
+            # 更新时本地文件会被新文件替换（新inode），硬链接即可保留旧内容而无需复制
+            try:
+                os.link(self.local_path, backup_file)
+            except OSError:
+                # 跨文件系统、不支持硬链接或备份文件已存在时退回复制
+                shutil.copy2(self.local_path, backup_file)
             logging.info(f"已备份当前规则到: {backup_file}")
             return backup_file
         except Exception as e:
@@ -85,27 +209,28 @@ class RulePuller:
             return None
             
     def load_config(self):
-        """加载配置文件"""
-        if not self.config_file.exists():
-            return {
-                "last_update": None,
-                "current_version": None,
-                "auto_sync": True,
-                "sync_interval_hours": 72
-            }
-            
+        """加载配置文件，不存在或无法解析时返回默认配置"""
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
+            with open(self.config_file, 'rb') as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return dict(_DEFAULT_CONFIG)
+        except (OSError, ValueError) as e:
             logging.error(f"加载配置失败: {e}")
-            return self.load_config()  # 返回默认配置
+            return dict(_DEFAULT_CONFIG)
             
     def save_config(self, config):
-        """保存配置文件"""
+        """保存配置文件（内容未变化时跳过写入，写入时先写临时文件再原子替换）"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            data = json.dumps(config, indent=2, ensure_ascii=False).encode('utf-8')
+            try:
+                if self.config_file.read_bytes() == data:
+                    return
+            except FileNotFoundError:
+                pass
+            tmp_file = self.config_file.with_suffix('.tmp')
+            tmp_file.write_bytes(data)
+            os.replace(tmp_file, self.config_file)
         except Exception as e:
             logging.error(f"保存配置失败: {e}")
             
@@ -118,9 +243,17 @@ class RulePuller:
         if not last_update:
             return True
             
+        interval = timedelta(hours=config.get("sync_interval_hours", 72))
+        
+        # 本地规则文件在同步间隔内修改过（如本地编辑），一次stat即可跳过网络请求
+        try:
+            if time.time_ns() - self.local_path.stat().st_mtime_ns < interval.total_seconds() * 1_000_000_000:
+                return False
+        except OSError:
+            pass
+            
         try:
             last_time = datetime.fromisoformat(last_update)
-            interval = timedelta(hours=config.get("sync_interval_hours", 72))
             return datetime.now() - last_time >= interval
         except:
             return True
@@ -135,35 +268,43 @@ class RulePuller:
             logging.info("无需更新（未到同步时间）")
             return True
             
-        # 备份当前文件
-        backup_file = self.backup_current_rules()
-        
-        # 下载新规则文件
+        # 下载新规则文件（条件请求，远端未修改时不传输内容）
         temp_file = self.local_path.with_suffix('.md.tmp')
         raw_url = self.get_github_raw_url('project_rules.md')
         
-        if not self.download_file(raw_url, temp_file):
+        result = self.download_file(raw_url, temp_file, config)
+        if result is None:
             logging.error("下载新规则文件失败")
-            if backup_file:
-                temp_file.unlink(missing_ok=True)
+            temp_file.unlink(missing_ok=True)
             return False
+        
+        config["etag"] = result["etag"]
+        config["last_modified"] = result["last_modified"]
+        
+        if result["status"] == 304:
+            logging.info("远端规则文件未修改，无需更新")
+            config["last_update"] = datetime.now().isoformat()
+            self.save_config(config)
+            return True
             
         # 验证文件完整性
-        if not temp_file.exists() or temp_file.stat().st_size == 0:
-            logging.error("下载的文件为空或不存在")
+        if not result["size"]:
+            logging.error("下载的文件为空")
             temp_file.unlink(missing_ok=True)
             return False
             
-        # 比较文件内容
-        current_hash = None
+        # 比较文件内容（新文件摘要已在下载时算出，本地文件未变动时无需重读）
         if self.local_path.exists():
-            current_hash = self.calculate_md5(self.local_path)
-            new_hash = self.calculate_md5(temp_file)
-            
-            if current_hash == new_hash:
+            if self._local_sha256(config) == result["sha256"]:
                 logging.info("规则文件内容相同，无需更新")
                 temp_file.unlink()
+                self._record_local_state(config, result["sha256"])
+                config["last_update"] = datetime.now().isoformat()
+                self.save_config(config)
                 return True
+        
+        # 内容确有变化时才备份当前文件
+        backup_file = self.backup_current_rules()
                 
         # 替换文件
         try:
@@ -172,6 +313,7 @@ class RulePuller:
             temp_file.rename(self.local_path)
             
             # 更新配置
+            self._record_local_state(config, result["sha256"])
             config["last_update"] = datetime.now().isoformat()
             config["current_version"] = datetime.now().strftime("%Y%m%d_%H%M%S")
             self.save_config(config)
@@ -182,9 +324,14 @@ class RulePuller:
         except Exception as e:
             logging.error(f"替换文件失败: {e}")
             if backup_file:
-                # 恢复备份
-                import shutil
-                shutil.copy2(backup_file, self.local_path)
+                # 恢复备份（备份可能是本地文件的硬链接，本地文件未被删除时无需恢复）
+                try:
+                    if not (self.local_path.exists() and os.path.samefile(backup_file, self.local_path)):
+                        restore_file = self.local_path.with_suffix('.md.restore')
+                        shutil.copy2(backup_file, restore_file)
+                        os.replace(restore_file, self.local_path)
+                except OSError as restore_error:
+                    logging.error(f"恢复备份失败: {restore_error}")
             temp_file.unlink(missing_ok=True)
             return False
             
@@ -235,9 +382,11 @@ def main():
             success = puller.update_rules()
             sys.exit(0 if success else 1)
         elif sys.argv[1] == "force":
-            # 强制更新，忽略时间间隔
+            # 强制更新，忽略时间间隔并重新完整下载
             config = puller.load_config()
             config["last_update"] = None
+            config["etag"] = None
+            config["last_modified"] = None
             puller.save_config(config)
             success = puller.update_rules()
             sys.exit(0 if success else 1)